@@ -1,11 +1,60 @@
+import os
+
+def count_physical_cores():
+    # GEMM-heavy inference gains nothing from SMT siblings, so size thread pools by physical cores
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as cpuinfo:
+            cores = set()
+            physical_id = None
+            for line in cpuinfo:
+                key, _, value = line.partition(":")
+                key = key.strip()
+                if key == "physical id":
+                    physical_id = value.strip()
+                elif key == "core id":
+                    cores.add((physical_id, value.strip()))
+    except OSError:
+        cores = set()
+    return len(cores) or os.cpu_count() or 1
+
+PHYSICAL_CORES = count_physical_cores()
+
+# --- CPU MATH & THREADING (must be set before torch/oneDNN initialise) ---
+os.environ.setdefault("DNNL_DEFAULT_FPMATH_MODE", "BF16")
+os.environ.setdefault("THP_MEM_ALLOC_ENABLE", "1")
+os.environ.setdefault("LRU_CACHE_CAPACITY", "1024")
+os.environ.setdefault("OMP_NUM_THREADS", str(PHYSICAL_CORES))
+os.environ.setdefault("MKL_NUM_THREADS", str(PHYSICAL_CORES))
+
 import streamlit as st
-import whisper
+import torch
+from faster_whisper import WhisperModel
 import ffmpeg
-import os
+import numpy as np
+import contextlib
+import functools
 import hashlib
+import json
+import logging
 import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
+from requests.adapters import HTTPAdapter
 from deep_translator import GoogleTranslator
+from deep_translator.exceptions import (
+    NotValidLength, NotValidPayload, RequestError, TooManyRequests, TranslationNotFound
+)
+
+logger = logging.getLogger(__name__)
+
+# Everything GoogleTranslator.translate() raises for a bad response, an oversized payload or a network failure
+TRANSLATION_ERRORS = (
+    RequestError, TooManyRequests, TranslationNotFound, NotValidPayload, NotValidLength, requests.RequestException
+)
 
 # --- SILENCE NOISY AI WARNINGS ---
 import warnings
@@ -13,6 +62,17 @@ from transformers import pipeline, logging as hf_logging
 warnings.filterwarnings("ignore")
 hf_logging.set_verbosity_error()
 
+@st.cache_resource(show_spinner=False)
+def configure_torch_threads():
+    # Inter-op threads can only be set once per process, before any parallel work starts
+    torch.set_num_threads(PHYSICAL_CORES)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+
+configure_torch_threads()
+
 # --- PAGE SETUP ---
 st.set_page_config(page_title="AI Video Transcriber", layout="wide", page_icon="🎬")
 st.title("🎬 Comprehensive AI Video Transcriber & Captioner")
@@ -23,49 +83,329 @@ if "action_type" not in st.session_state:
 
 # --- CREATE CACHE FOLDER ---
 CACHE_DIR = "cache"
+CACHE_MAX_BYTES = int(os.environ.get("CACHE_MAX_MB", "4096")) * 1024 * 1024
 if not os.path.exists(CACHE_DIR):
     os.makedirs(CACHE_DIR)
 
 # --- CACHING THE AI MODELS ---
-@st.cache_resource(show_spinner=False)
+# Capped so sizes a user merely scrolled past are evicted instead of piling up in RAM
+@st.cache_resource(show_spinner=False, max_entries=2)
 def load_standard_model(size):
-    return whisper.load_model(size, device="cpu")
+    # One resident copy per model size: CTranslate2 runs up to TRANSCRIBE_WORKERS
+    # transcriptions concurrently on the same weights, each on its share of the cores
+    return WhisperModel(
+        size, device="cpu", compute_type="int8",
+        cpu_threads=max(1, PHYSICAL_CORES // TRANSCRIBE_WORKERS), num_workers=TRANSCRIBE_WORKERS
+    )
 
-@st.cache_resource(show_spinner=False)
+@st.cache_resource(show_spinner=False, max_entries=1)
 def load_akan_model():
-    return pipeline(
+    pipe = pipeline(
         "automatic-speech-recognition",
         model="facebook/mms-1b-all",
-        model_kwargs={"target_lang": "aka", "ignore_mismatched_sizes": True},
+        model_kwargs={"target_lang": "aka", "ignore_mismatched_sizes": True, "attn_implementation": "sdpa"},
+        torch_dtype=torch.float32,
+        batch_size=8,
         device="cpu"
     )
+    # Inductor needs a C/C++ toolchain at runtime, which the slim Docker image does not ship
+    if os.environ.get("TORCH_COMPILE") == "1":
+        pipe.model = torch.compile(pipe.model, backend="inductor")
+    return pipe
+
+@st.cache_resource(show_spinner=False)
+def cpu_has_native_bf16():
+    # Autocast to BF16 is only a win with hardware BF16 (AVX512-BF16/AMX on x86, BF16 on Arm);
+    # elsewhere it is emulated and slower than FP32
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as cpuinfo:
+            flags = set(cpuinfo.read().split())
+    except OSError:
+        return False
+    return bool(flags & {"avx512_bf16", "amx_bf16", "bf16"})
 
 # --- UTILITY FUNCTIONS ---
-def get_file_hash(uploaded_file):
-    sha256_hash = hashlib.sha256()
-    for chunk in iter(lambda: uploaded_file.read(4096), b""):
-        sha256_hash.update(chunk)
-    uploaded_file.seek(0)
-    return sha256_hash.hexdigest()
+def save_upload(uploaded_file):
+    # Streamlit already holds the upload in memory, so hash and write straight from that
+    # buffer instead of copying it through read() calls.
+    # BLAKE2 is much faster than SHA-256 in software and is only used as a cache key here.
+    with uploaded_file.getbuffer() as buf:
+        file_hash = hashlib.blake2b(buf, digest_size=16).hexdigest()
+        input_video = os.path.join(CACHE_DIR, f"{file_hash}_input.mp4")
+        if not os.path.exists(input_video):
+            # Write under a temporary name first so a half-written file never looks cached
+            with tempfile.NamedTemporaryFile(dir=CACHE_DIR, suffix=".part", delete=False) as tmp_file:
+                tmp_file.write(buf)
+            os.replace(tmp_file.name, input_video)
+    return file_hash, input_video
+
+def options_key(*parts):
+    # Short stable name for a combination of options, used to key cached artifacts
+    return hashlib.blake2b("|".join(map(str, parts)).encode("utf-8"), digest_size=12).hexdigest()
 
+@st.cache_resource(show_spinner=False)
+def artifacts_registry():
+    # Process-wide, so one session's pruning never deletes files another session is working on
+    return {"lock": threading.Lock(), "in_use": {}}
+
+@contextlib.contextmanager
+def artifacts_in_use(*paths):
+    registry = artifacts_registry()
+    with registry["lock"]:
+        for path in paths:
+            registry["in_use"][path] = registry["in_use"].get(path, 0) + 1
+    try:
+        yield
+    finally:
+        with registry["lock"]:
+            for path in paths:
+                registry["in_use"][path] -= 1
+                if not registry["in_use"][path]:
+                    del registry["in_use"][path]
+
+def touch_artifact(path):
+    # Only the access time is bumped: prune_cache evicts on it, while read_artifact keys on
+    # mtime, which must stay put for its in-memory copy to remain valid
+    stat = os.stat(path)
+    os.utime(path, ns=(time.time_ns(), stat.st_mtime_ns))
+    return stat
+
+def prune_cache(protected=()):
+    # Evict the least recently used artifacts once the cache folder outgrows its budget
+    with artifacts_registry()["lock"]:
+        protected = set(protected) | set(artifacts_registry()["in_use"])
+    entries = [(entry.path, entry.stat()) for entry in os.scandir(CACHE_DIR) if entry.is_file()]
+    total = sum(stat.st_size for _, stat in entries)
+    for path, stat in sorted(entries, key=lambda item: item[1].st_atime):
+        if total <= CACHE_MAX_BYTES:
+            break
+        if path in protected:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= stat.st_size
+
+# Inputs come from colour pickers and sliders, so the same few values repeat on every rerun
+@functools.lru_cache(maxsize=256)
 def hex_to_ass(hex_code, opacity=100):
-    hex_code = hex_code.lstrip('#')
-    r, g, b = hex_code[0:2], hex_code[2:4], hex_code[4:6]
-    alpha = hex(int(255 - (opacity / 100 * 255)))[2:].zfill(2).upper()
-    return f"&H{alpha}{b}{g}{r}"
+    hex_code = hex_code.lstrip('#').upper()
+    alpha = ((100 - opacity) * 255 // 100) & 0xFF
+    return f"&H{alpha:02X}{hex_code[4:6]}{hex_code[2:4]}{hex_code[0:2]}"
 
 def format_timestamp(seconds):
-    if seconds is None:
-        seconds = 0.0
-    hours, remainder = divmod(seconds, 3600)
-    minutes, secs = divmod(remainder, 60)
-    millis = int((secs - int(secs)) * 1000)
-    return f"{int(hours):02}:{int(minutes):02}:{int(secs):02},{millis:03}"
+    millis = int((seconds or 0.0) * 1000 + 0.5)
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02}:{minutes:02}:{secs:02},{millis:03}"
+
+# cache_resource hands back the same bytes object on every rerun, whereas cache_data
+# would unpickle a fresh copy of a (possibly 200MB) video each time
+@st.cache_resource(show_spinner=False, max_entries=4)
+def read_artifact(path, mtime):
+    # mtime is only part of the cache key, so a regenerated file is read again
+    with open(path, "rb") as f:
+        return f.read()
+
+def load_artifact(path):
+    return read_artifact(path, touch_artifact(path).st_mtime)
+
+# --- HARDWARE VIDEO ENCODING ---
+HW_ENCODERS = ["h264_nvenc", "h264_qsv", "h264_vaapi", "h264_videotoolbox"]
+VAAPI_DEVICE = os.environ.get("VAAPI_DEVICE", "/dev/dri/renderD128")
+
+@st.cache_resource(show_spinner=False)
+def list_ffmpeg_encoders():
+    try:
+        return subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            capture_output=True, text=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+@st.cache_resource(show_spinner=False)
+def detect_video_encoder():
+    # Opt-in only: CPU-only hosts keep the default libx264 path
+    if os.environ.get("ALLOW_HWENC") != "1":
+        return "libx264"
+    encoders = list_ffmpeg_encoders()
+    for encoder in HW_ENCODERS:
+        if f" {encoder} " in encoders:
+            return encoder
+    return "libx264"
+
+EXPORT_HEIGHTS = {"1080p": 1080, "720p (Recommended)": 720, "480p": 480}
+
+def build_burn_filter(encoder, height, overlay_filters):
+    # Hardware paths decode and scale on the device, then download once for the
+    # CPU-only subtitles/drawtext filters instead of copying every frame twice
+    if encoder == "h264_nvenc":
+        scale = f"scale_cuda=-2:{height}," if height else ""
+        return f"{scale}hwdownload,format=nv12,{overlay_filters}"
+    if encoder == "h264_qsv":
+        scale = f"scale_qsv=w=-1:h={height}," if height else ""
+        return f"{scale}hwdownload,format=nv12,{overlay_filters},format=nv12"
+    if encoder == "h264_vaapi":
+        scale = f"scale_vaapi=w=-2:h={height}," if height else ""
+        return f"{scale}hwdownload,format=nv12,{overlay_filters},format=nv12,hwupload"
+    scale = f"scale=-2:{height}," if height else ""
+    return f"{scale}{overlay_filters}"
+
+# Audio codecs the MP4 muxer accepts as-is, so the burn step can copy them untouched
+MP4_AUDIO_CODECS = {"aac", "mp3", "alac", "opus", "ac3", "eac3"}
+
+def burn_audio_codec(input_video):
+    streams = ffmpeg.probe(input_video, select_streams="a:0")["streams"]
+    if streams and streams[0].get("codec_name") not in MP4_AUDIO_CODECS:
+        return "aac"
+    return "copy"
+
+def build_burn_command(input_video, output_video, height, overlay_filters, encoder):
+    if encoder == "copy":
+        return ffmpeg.input(input_video).output(
+            output_video, vcodec="copy", acodec=burn_audio_codec(input_video), movflags="+faststart"
+        )
+
+    input_kwargs = {}
+    output_kwargs = {"vcodec": "libx264", "preset": "veryfast", "crf": 23, "threads": 0}
+    if encoder == "h264_nvenc":
+        input_kwargs = {"hwaccel": "cuda", "hwaccel_output_format": "cuda"}
+        output_kwargs = {"vcodec": encoder, "preset": "p4", "cq": 23, "b:v": "3000k"}
+    elif encoder == "h264_qsv":
+        input_kwargs = {"hwaccel": "qsv", "hwaccel_output_format": "qsv"}
+        output_kwargs = {"vcodec": encoder, "preset": "fast"}
+    elif encoder == "h264_vaapi":
+        input_kwargs = {"vaapi_device": VAAPI_DEVICE, "hwaccel": "vaapi", "hwaccel_output_format": "vaapi"}
+        output_kwargs = {"vcodec": encoder}
+    elif encoder == "h264_videotoolbox":
+        # VideoToolbox decodes to system memory, so it shares the software filter chain
+        input_kwargs = {"hwaccel": "videotoolbox"}
+        output_kwargs = {"vcodec": encoder, "b:v": "3000k"}
+    vf_string = build_burn_filter(encoder, height, overlay_filters)
+    return ffmpeg.input(input_video, **input_kwargs).output(
+        output_video, vf=vf_string, acodec=burn_audio_codec(input_video), movflags="+faststart", **output_kwargs
+    )
+
+AUDIO_SAMPLE_RATE = 16000
+
+def load_audio_array(input_video, audio_path):
+    # Both ASR engines want 16kHz mono float32, so decode the audio once per upload
+    # and hand them the samples directly instead of letting each one demux the video
+    if os.path.exists(audio_path):
+        return np.fromfile(audio_path, np.float32)
+
+    out, _ = (
+        ffmpeg.input(input_video)
+        .output("pipe:", format="f32le", ac=1, ar=AUDIO_SAMPLE_RATE, vn=None, threads=0)
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+    # Write under a temporary name first so a truncated sample file never looks cached
+    with tempfile.NamedTemporaryFile(dir=CACHE_DIR, suffix=".part", delete=False) as tmp_file:
+        tmp_file.write(out)
+    os.replace(tmp_file.name, audio_path)
+    return np.frombuffer(out, np.float32)
+
+# --- SILENCE-ALIGNED AUDIO SLICES ---
+TRANSCRIBE_WORKERS = max(1, PHYSICAL_CORES // 2)
+SLICE_SECONDS = 120
+# One Whisper window; shorter slices lose too much context at the cuts
+MIN_SLICE_SECONDS = 30
+SILENCE_SEARCH_SECONDS = 10
+
+def split_on_silence(audio, slice_seconds=SLICE_SECONDS):
+    # Cut long audio into ~slice_seconds slices, moving each cut to the quietest 100ms frame
+    # nearby so no word is split between two slices
+    total = len(audio)
+    slice_length = int(slice_seconds * AUDIO_SAMPLE_RATE)
+    if total <= slice_length * 1.5:
+        return [(0, total)]
+
+    frame = AUDIO_SAMPLE_RATE // 10
+    frames = total // frame
+    energy = np.square(audio[:frames * frame]).reshape(frames, frame).mean(axis=1)
+    search = SILENCE_SEARCH_SECONDS * 10
+
+    bounds = [0]
+    while total - bounds[-1] > slice_length * 1.5:
+        centre = (bounds[-1] + slice_length) // frame
+        lo = max(centre - search, bounds[-1] // frame + 1)
+        hi = min(centre + search, frames)
+        bounds.append((lo + int(np.argmin(energy[lo:hi]))) * frame + frame // 2)
+    bounds.append(total)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def run_with_progress(stream, duration, progress_bar):
+    # ffmpeg writes key=value progress blocks to stdout. stderr is limited to errors and is
+    # drained on a side thread, so neither pipe can fill up and stall the encoder
+    process = (
+        stream.global_args("-progress", "pipe:1", "-nostats", "-loglevel", "error")
+        .run_async(pipe_stdout=True, pipe_stderr=True, overwrite_output=True)
+    )
+    stderr_chunks = []
+    drain = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True)
+    drain.start()
+
+    for line in process.stdout:
+        key, _, value = line.decode("utf-8", "replace").strip().partition("=")
+        if key == "out_time_us" and duration and value.isdigit():
+            progress_bar.progress(min(100, int(int(value) / 1_000_000 / duration * 100)))
+
+    process.wait()
+    drain.join()
+    if process.returncode != 0:
+        raise ffmpeg.Error("ffmpeg", None, b"".join(stderr_chunks))
+
+# --- MP3 EXTRACTION ---
+@st.cache_resource(show_spinner=False)
+def detect_mp3_encoder_options():
+    # The fixed-point shine encoder is several times faster than LAME;
+    # otherwise LAME at VBR q=5 (~130kbps) is audibly identical to q=2 for ripped speech
+    if " libshine " in list_ffmpeg_encoders():
+        return {"acodec": "libshine", "audio_bitrate": "128k"}
+    return {"acodec": "libmp3lame", "q": 5}
+
+def extract_mp3(input_video, output_mp3, progress_bar):
+    probe = ffmpeg.probe(input_video)
+    audio_streams = [stream for stream in probe["streams"] if stream.get("codec_type") == "audio"]
+
+    # Audio that is already MP3 only needs remuxing, not a decode/encode pass
+    if audio_streams and audio_streams[0].get("codec_name") == "mp3":
+        output_options = {"acodec": "copy"}
+    else:
+        # A single pass: separately encoded parts each carry their own encoder delay and
+        # padding, so concatenating them clicks at every boundary
+        output_options = detect_mp3_encoder_options()
+
+    duration = float(probe["format"].get("duration", 0))
+    try:
+        run_with_progress(ffmpeg.input(input_video).output(output_mp3, vn=None, **output_options), duration, progress_bar)
+    except ffmpeg.Error:
+        # Never leave a half-written MP3 behind to be served as a cached result
+        if os.path.exists(output_mp3):
+            os.remove(output_mp3)
+        raise
 
 # --- SIDEBAR: SETTINGS ---
 st.sidebar.header("⚙️ AI Engine Settings")
 
-model_size = st.sidebar.selectbox("Whisper Model Size", ["base", "small", "medium", "large"], index=0)
+# Labels shown in the sidebar mapped to faster-whisper (CTranslate2) model ids
+WHISPER_MODELS = {
+    "tiny (fastest)": "tiny",
+    "base": "base",
+    "small": "small",
+    "distil-small.en (fast, English only)": "distil-small.en",
+    "distil-medium.en (English only)": "distil-medium.en",
+    "distil-large-v3 (best English accuracy)": "distil-large-v3",
+    "medium (slow on CPU)": "medium",
+    "large-v3 (very slow on CPU)": "large-v3"
+}
+ENGLISH_ONLY_MODELS = {"distil-small.en", "distil-medium.en", "distil-large-v3"}
+
+model_label = st.sidebar.selectbox("Whisper Model", list(WHISPER_MODELS), index=1)
+model_size = WHISPER_MODELS[model_label]
 task = st.sidebar.radio("AI Task", ["Transcribe (Original Language)", "Translate to English"])
 
 LANGUAGES = [
@@ -75,11 +415,25 @@ LANGUAGES = [
 ]
 selected_lang = st.sidebar.selectbox("Spoken Language", LANGUAGES, index=0)
 
+# faster-whisper expects ISO codes rather than full language names
+WHISPER_LANG_CODES = {
+    "English": "en", "Spanish": "es", "French": "fr", "German": "de",
+    "Italian": "it", "Portuguese": "pt", "Dutch": "nl", "Russian": "ru",
+    "Japanese": "ja", "Chinese": "zh", "Arabic": "ar", "Hindi": "hi",
+    "Swahili": "sw", "Yoruba": "yo"
+}
+
 if selected_lang == "Akan (Twi)":
     st.sidebar.info("🇬🇭 **Akan (Twi):** Powered by Meta MMS Enterprise Model.")
 elif selected_lang == "Auto-Detect":
     st.sidebar.success("🌐 **Auto-Detect Active.**")
 
+if selected_lang != "Akan (Twi)" and model_size in ENGLISH_ONLY_MODELS:
+    if selected_lang not in ("English", "Auto-Detect") or task == "Translate to English":
+        st.sidebar.warning("⚠️ Distilled models only transcribe English speech. Pick base, small or medium for other languages or translation.")
+elif model_size in ("medium", "large-v3"):
+    st.sidebar.warning("🐢 This model can take longer than the video itself on CPU. Try distil-large-v3 for English.")
+
 st.sidebar.header("🚀 Performance Options")
 export_res = st.sidebar.selectbox(
     "Scale Down Video For Faster CPU Rendering",
@@ -92,6 +446,8 @@ if st.sidebar.button("Clear Server Cache"):
     if os.path.exists(CACHE_DIR):
         shutil.rmtree(CACHE_DIR)
         os.makedirs(CACHE_DIR)
+    st.cache_data.clear()
+    read_artifact.clear()
     st.sidebar.success("✅ Server cache completely wiped!")
 
 # --- MONETIZATION: SECURE EMAIL & SUBSCRIPTION CHECK ---
@@ -99,9 +455,21 @@ st.sidebar.header("🏷️ Branding (Watermark)")
 
 PAYSTACK_SECRET = os.environ.get("PAYSTACK_SECRET_KEY")
 
+@st.cache_resource(show_spinner=False)
+def get_paystack_session():
+    # Shared across reruns so the TCP/TLS handshake is reused
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=2))
+    return session
+
+@st.cache_data(ttl=300, show_spinner=False)
 def verify_subscription(sub_code, user_email):
+    # Returns (is_active, checked_at) so the sidebar can show how old a cached answer is.
+    # Network and decode errors propagate instead, since cache_data never stores an
+    # exception and a transient outage must not lock a paying user out for the whole TTL
+    checked_at = time.time()
     if not PAYSTACK_SECRET or not user_email or not sub_code:
-        return False
+        return False, checked_at
 
     url = f"https://api.paystack.co/subscription/{sub_code}"
     headers = {
@@ -109,18 +477,60 @@ def verify_subscription(sub_code, user_email):
         "Cache-Control": "no-cache"
     }
 
-    try:
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            data = response.json()
-            status = data.get("data", {}).get("status")
-            api_email = data.get("data", {}).get("customer", {}).get("email", "")
-
-            if status == "active" and api_email.strip().lower() == user_email.strip().lower():
-                return True
-        return False
-    except:
-        return False
+    response = get_paystack_session().get(url, headers=headers, timeout=5)
+    if response.status_code == 200:
+        data = response.json()
+        status = data.get("data", {}).get("status")
+        api_email = data.get("data", {}).get("customer", {}).get("email", "")
+
+        if status == "active" and api_email.strip().lower() == user_email.strip().lower():
+            return True, checked_at
+    elif response.status_code >= 500:
+        response.raise_for_status()
+    return False, checked_at
+
+SUBSCRIPTION_DEBOUNCE_SECONDS = 0.5
+
+def start_subscription_check(sub_code, user_email):
+    # The worker only fills in a plain dict, it never touches Streamlit from its own thread
+    check = {"key": (sub_code, user_email), "result": None, "failed": False}
+
+    def run():
+        try:
+            check["result"] = verify_subscription(sub_code, user_email)
+        except (requests.RequestException, ValueError) as e:
+            logger.warning("paystack verify failed: %s", e)
+            check["failed"] = True
+            check["result"] = (False, time.time())
+        except Exception:
+            # Anything else (e.g. a null customer in the response) must still post a result,
+            # or the sidebar would poll "Checking subscription..." forever
+            logger.exception("paystack verify crashed")
+            check["result"] = (False, time.time())
+
+    threading.Thread(target=run, daemon=True).start()
+    return check
+
+def retry_subscription_check():
+    # Runs as a button callback, ahead of the rerun, so the next pass starts a fresh check
+    st.session_state.sub_status = None
+
+@st.fragment(run_every=0.25)
+def poll_subscription_check():
+    key, changed_at = st.session_state.pending_check
+    check = st.session_state.get("sub_status")
+
+    # Only hit Paystack once the code and email have stopped changing
+    if check is None:
+        if time.time() - changed_at < SUBSCRIPTION_DEBOUNCE_SECONDS:
+            st.info("⏳ Checking subscription...")
+            return
+        st.session_state.sub_status = check = start_subscription_check(*key)
+
+    if check["result"] is None:
+        st.info("⏳ Checking subscription...")
+        return
+    st.rerun()
 
 user_email_input = st.sidebar.text_input("📧 Enter your Email Address")
 
@@ -132,19 +542,36 @@ else:
 pro_input = st.sidebar.text_input("🔑 Enter Paystack Subscription Code (e.g., SUB_...)", type="password")
 
 is_pro = False
+sub_checked = False
+sub_check_failed = False
 if pro_input and user_email_input:
-    with st.sidebar:
-        with st.spinner("Verifying email and subscription securely..."):
-            is_pro = verify_subscription(pro_input, user_email_input)
+    sub_key = (pro_input, user_email_input)
+    pending = st.session_state.get("pending_check")
+    if not pending or pending[0] != sub_key:
+        st.session_state.pending_check = (sub_key, time.time())
+        st.session_state.sub_status = None
+
+    check = st.session_state.get("sub_status")
+    if check is not None and check["result"] is not None:
+        is_pro, sub_checked_at = check["result"]
+        sub_checked = True
+        sub_check_failed = check["failed"]
+    else:
+        with st.sidebar:
+            poll_subscription_check()
 
 if is_pro:
     st.sidebar.success("🔓 Active Subscription Confirmed! Watermark tools unlocked.")
+    st.sidebar.caption(f"Subscription last checked {int(time.time() - sub_checked_at)}s ago.")
     watermark_text = st.sidebar.text_input("Watermark Text (Leave blank for none)", "")
     watermark_size = st.sidebar.slider("Watermark Text Size", 10, 100, 24)
     watermark_opacity = st.sidebar.slider("Watermark Opacity", 0.0, 1.0, 0.5)
 else:
     st.sidebar.error("🔒 App renders with 'Hackerslord Studios' watermark.")
-    if pro_input and user_email_input:
+    if sub_check_failed:
+        st.sidebar.warning("⚠️ Could not reach Paystack to verify your subscription.")
+        st.sidebar.button("🔄 Retry Verification", on_click=retry_subscription_check)
+    elif sub_checked:
         st.sidebar.error("❌ Verification failed. Code is invalid, inactive, or does not match this email address.")
 
     paystack_url = "https://paystack.shop/pay/spb9j8vcmc"
@@ -176,21 +603,254 @@ else:
     final_back_color = hex_to_ass(st.sidebar.color_picker("Box Color", "#000000"), st.sidebar.slider("Box Opacity (%)", 0, 100, 80))
 
 
+# --- TRANSLATION ---
+# Google rejects requests over 5000 characters
+TRANSLATE_BATCH_CHARS = 4500
+
+def batch_texts(texts):
+    batch, size = [], 0
+    for text in texts:
+        if batch and size + len(text) + 1 > TRANSLATE_BATCH_CHARS:
+            yield batch
+            batch, size = [], 0
+        batch.append(text)
+        size += len(text) + 1
+    if batch:
+        yield batch
+
+def translate_to_english(texts, cache_path):
+    # Known translations are kept per upload, so a repeat run (e.g. SRT then burn) skips the network
+    try:
+        with open(cache_path, encoding="utf-8") as cache_file:
+            known = json.load(cache_file)
+    except (OSError, ValueError):
+        known = {}
+
+    missing = list(dict.fromkeys(text for text in texts if text and text not in known))
+    if missing:
+        translator = GoogleTranslator(source='auto', target='en')
+        # translate_batch() still sends one request per text, so join each batch into
+        # a single newline-separated request and split the answer back apart
+        for batch in batch_texts(missing):
+            try:
+                translated = (translator.translate("\n".join(batch)) or "").split("\n")
+            except TRANSLATION_ERRORS as e:
+                logger.warning("batch translation failed, retrying per entry: %s", e)
+                translated = []
+            if len(translated) == len(batch):
+                known.update(zip(batch, (line.strip() for line in translated)))
+                continue
+            for text in batch:
+                try:
+                    known[text] = translator.translate(text) or text
+                except TRANSLATION_ERRORS as e:
+                    logger.warning("translation failed, keeping original text: %s", e)
+
+        with open(cache_path, "w", encoding="utf-8") as cache_file:
+            json.dump(known, cache_file, ensure_ascii=False)
+
+    return [known.get(text, text) for text in texts]
+
+# --- TRANSCRIPTION PIPELINE ---
+# Output files are named after the file hash and every option that changes the transcript,
+# so the caller only runs this on a miss. It is deliberately not st.cache_data: that would
+# replay the progress/status updates on a hit against elements created outside the function.
+# Both files are written under a temporary name and only moved into place once complete.
+def transcribe_and_format(file_hash, input_video, audio_path, output_srt, output_txt, model_size, lang, task, progress_bar, status_text):
+    srt_part = f"{output_srt}.part"
+    txt_part = f"{output_txt}.part"
+
+    status_text.info("Phase 1/4: Extracting Audio & Loading AI Model into Memory...")
+    progress_bar.progress(25)
+
+    try:
+        audio = load_audio_array(input_video, audio_path)
+    except ffmpeg.Error as e:
+        st.error(f"FFmpeg Error: {e.stderr.decode('utf-8')}")
+        st.stop()
+
+    if lang == "Akan (Twi)":
+        pipe = load_akan_model()
+        status_text.warning("Phase 2/4: Transcribing with Meta MMS (This takes a few minutes...)")
+        progress_bar.progress(50)
+
+        # Pass 1: run MMS slice by slice and group words into ~3 second subtitle entries as
+        # each slice finishes, so only one slice's word timestamps are ever held in memory
+        slices = split_on_silence(audio)
+        entries = []
+        current_chunk = {"words": [], "start": None, "end": None}
+
+        for slice_idx, (slice_start, slice_end) in enumerate(slices, start=1):
+            offset = slice_start / AUDIO_SAMPLE_RATE
+            with torch.inference_mode(), torch.autocast("cpu", dtype=torch.bfloat16, enabled=cpu_has_native_bf16()):
+                result = pipe(
+                    {"raw": audio[slice_start:slice_end], "sampling_rate": AUDIO_SAMPLE_RATE},
+                    chunk_length_s=30,
+                    stride_length_s=(5, 5),
+                    return_timestamps="word"
+                )
+
+            for word_data in result.get("chunks", []):
+                word = word_data["text"]
+                timestamp = word_data.get("timestamp", (None, None))
+                start, end = timestamp
+
+                if start is None or end is None:
+                    continue
+                start += offset
+                end += offset
+
+                if current_chunk["start"] is None:
+                    current_chunk["start"] = start
+                    current_chunk["end"] = end
+                    current_chunk["words"] = [word]
+
+                elif (end - current_chunk["start"]) <= 3.0:
+                    current_chunk["end"] = end
+                    current_chunk["words"].append(word)
+
+                else:
+                    entries.append((current_chunk["start"], current_chunk["end"], " ".join(current_chunk["words"]).strip()))
+                    current_chunk = {"start": start, "end": end, "words": [word]}
+
+            progress_bar.progress(50 + int(25 * slice_idx / len(slices)))
+
+        if current_chunk["start"] is not None:
+            entries.append((current_chunk["start"], current_chunk["end"], " ".join(current_chunk["words"]).strip()))
+
+        status_text.info("Phase 3/4: Formatting & Translating Subtitles...")
+        progress_bar.progress(75)
+
+        # Pass 2: --- INTERCEPT & TRANSLATE ---
+        texts = [text for _, _, text in entries]
+        if task == "Translate to English":
+            texts = translate_to_english(texts, os.path.join(CACHE_DIR, f"{file_hash}_trans.json"))
+
+        srt_parts = []
+        txt_parts = []
+        for srt_idx, ((start, end, _), final_text) in enumerate(zip(entries, texts), start=1):
+            srt_parts.append(f"{srt_idx}\n{format_timestamp(start)} --> {format_timestamp(end)}\n{final_text}\n\n")
+            txt_parts.append(f"{final_text}\n")
+
+        with open(srt_part, "w", encoding="utf-8") as srt_file, open(txt_part, "w", encoding="utf-8") as txt_file:
+            srt_file.write("".join(srt_parts))
+            txt_file.write("".join(txt_parts))
+
+    else:
+        # The shared model gives each worker only its share of the cores, so clips are cut
+        # into at least one slice per worker to keep them all busy, never below one window
+        if TRANSCRIBE_WORKERS > 1:
+            seconds_per_worker = len(audio) / AUDIO_SAMPLE_RATE / TRANSCRIBE_WORKERS
+            slices = split_on_silence(audio, min(SLICE_SECONDS, max(MIN_SLICE_SECONDS, seconds_per_worker)))
+        else:
+            slices = [(0, len(audio))]
+        model = load_standard_model(model_size)
+        status_text.warning("Phase 2/4: Transcribing Audio (This takes a few minutes...)")
+        progress_bar.progress(50)
+
+        transcribe_options = {
+            "language": WHISPER_LANG_CODES.get(lang),
+            "task": "translate" if task == "Translate to English" else "transcribe",
+            "vad_filter": True,
+            "beam_size": 1,
+            "condition_on_previous_text": False
+        }
+
+        try:
+            if len(slices) == 1:
+                segments, info = model.transcribe(audio, **transcribe_options)
+
+                status_text.info("Phase 3/4: Transcribing & Formatting Subtitles...")
+
+                # Segments are decoded lazily, so each one goes straight to disk as it arrives
+                # and the bar can follow the decoder through the audio
+                with open(srt_part, "w", encoding="utf-8") as srt_file, open(txt_part, "w", encoding="utf-8") as txt_file:
+                    for i, segment in enumerate(segments, start=1):
+                        text = segment.text.strip()
+                        srt_file.write(f"{i}\n{format_timestamp(segment.start)} --> {format_timestamp(segment.end)}\n{text}\n\n")
+                        txt_file.write(f"{text}\n")
+                        if info.duration:
+                            progress_bar.progress(50 + int(49 * min(1.0, segment.end / info.duration)))
+            else:
+                # Detect the language once up front so every slice is transcribed the same way.
+                # VAD first, so a silent or musical intro isn't what gets classified; features
+                # are still only computed for the first 30s of speech
+                if transcribe_options["language"] is None:
+                    language, _, _ = model.detect_language(audio, vad_filter=True)
+                    transcribe_options["language"] = language
+
+                status_text.info(f"Phase 3/4: Transcribing {len(slices)} Slices in Parallel...")
+
+                def transcribe_slice(bounds):
+                    start, end = bounds
+                    offset = start / AUDIO_SAMPLE_RATE
+                    segments, _ = model.transcribe(audio[start:end], **transcribe_options)
+                    return [(segment.start + offset, segment.end + offset, segment.text.strip()) for segment in segments]
+
+                with ThreadPoolExecutor(max_workers=TRANSCRIBE_WORKERS) as executor:
+                    futures = [executor.submit(transcribe_slice, bounds) for bounds in slices]
+                    for done, _ in enumerate(as_completed(futures), start=1):
+                        progress_bar.progress(50 + int(49 * done / len(futures)))
+
+                with open(srt_part, "w", encoding="utf-8") as srt_file, open(txt_part, "w", encoding="utf-8") as txt_file:
+                    i = 1
+                    for future in futures:
+                        for start, end, text in future.result():
+                            srt_file.write(f"{i}\n{format_timestamp(start)} --> {format_timestamp(end)}\n{text}\n\n")
+                            txt_file.write(f"{text}\n")
+                            i += 1
+        except RuntimeError as e:
+            st.error(f"Transcription failed: {e}. Please try a different video or model size.")
+            st.stop()
+
+    os.replace(txt_part, output_txt)
+    os.replace(srt_part, output_srt)
+    progress_bar.progress(100)
+
+
 # --- MAIN APP INTERFACE ---
 st.info("⚠️ **Note:** To prevent server overload, maximum file upload size is restricted to 200MB.")
 uploaded_file = st.file_uploader("Upload a Video File", type=["mp4", "mov", "avi", "mkv"])
 
 if uploaded_file:
-    file_hash = get_file_hash(uploaded_file)
+    # file_id is stable across reruns, so the upload is only hashed and written once
+    # (or again if the cache folder was wiped in the meantime)
+    upload = st.session_state.get("saved_upload")
+    if not upload or upload[0] != uploaded_file.file_id or not os.path.exists(upload[2]):
+        upload = (uploaded_file.file_id, *save_upload(uploaded_file))
+        st.session_state.saved_upload = upload
+        prune_cache(protected=(upload[2],))
+    _, file_hash, input_video = upload
+
+    # Transcripts depend on the ASR options, burned videos additionally on every styling
+    # option, so each combination gets its own files instead of silently reusing stale ones
+    # (MMS ignores the Whisper model selector, so it must not invalidate Akan transcripts)
+    asr_model = "mms-1b-all" if selected_lang == "Akan (Twi)" else model_size
+    transcript_key = options_key(file_hash, asr_model, task, selected_lang)
+    burn_key = options_key(
+        transcript_key, export_res, font_family, font_size, text_color, stroke_color, stroke_width,
+        bg_mode, final_back_color, shadow_width, watermark_text, watermark_size, watermark_opacity
+    )
 
-    input_video = os.path.join(CACHE_DIR, f"{file_hash}_input.mp4")
-    output_srt = os.path.join(CACHE_DIR, f"{file_hash}_subs.srt")
-    output_txt = os.path.join(CACHE_DIR, f"{file_hash}_transcript.txt")
-    output_video = os.path.join(CACHE_DIR, f"{file_hash}_final.mp4")
+    output_srt = os.path.join(CACHE_DIR, f"{transcript_key}_subs.srt")
+    output_txt = os.path.join(CACHE_DIR, f"{transcript_key}_transcript.txt")
+    output_video = os.path.join(CACHE_DIR, f"{burn_key}_final.mp4")
     output_mp3 = os.path.join(CACHE_DIR, f"{file_hash}_audio.mp3")
-
-    with open(input_video, "wb") as f:
-        f.write(uploaded_file.read())
+    audio_path = os.path.join(CACHE_DIR, f"{file_hash}_16k.f32")
+    session_files = (input_video, audio_path, output_srt, output_txt, output_video, output_mp3)
+    touch_artifact(input_video)
+
+    # --- PRE-WARM THE SELECTED MODEL ---
+    # Load weights in the background while the user is still picking options; cache_resource
+    # makes the first transcription wait on (not repeat) an in-flight load. Nothing is loaded
+    # before there is a file to transcribe.
+    warm_key = ("akan",) if selected_lang == "Akan (Twi)" else ("whisper", model_size)
+    if st.session_state.get("warmed_model") != warm_key:
+        st.session_state.warmed_model = warm_key
+        if selected_lang == "Akan (Twi)":
+            threading.Thread(target=load_akan_model, daemon=True).start()
+        else:
+            threading.Thread(target=load_standard_model, args=(model_size,), daemon=True).start()
 
     st.video(input_video)
 
@@ -203,131 +863,36 @@ if uploaded_file:
     # --- PROCESSING BLOCK ---
     if st.session_state.action_type == "mp3":
         if not os.path.exists(output_mp3):
-            with st.spinner("🎵 Ripping high-quality MP3 audio from video..."):
+            with st.spinner("🎵 Ripping MP3 audio from video..."), artifacts_in_use(input_video, output_mp3):
+                mp3_progress = st.progress(0)
                 try:
-                    (
-                        ffmpeg.input(input_video)
-                        .output(output_mp3, acodec="libmp3lame", q=2)
-                        .run(overwrite_output=True, capture_stdout=True, capture_stderr=True)
-                    )
+                    extract_mp3(input_video, output_mp3, mp3_progress)
                 except ffmpeg.Error as e:
                     st.error(f"FFmpeg Error: {e.stderr.decode('utf-8')}")
+                mp3_progress.empty()
+            prune_cache(protected=session_files)
 
     elif st.session_state.action_type in ["srt", "txt", "burn"]:
         if not (os.path.exists(output_srt) and os.path.exists(output_txt)):
             progress_bar = st.progress(0)
             status_text = st.empty()
 
-            status_text.info("Phase 1/4: Loading AI Model into Memory...")
-            progress_bar.progress(25)
-
-            if selected_lang == "Akan (Twi)":
-                pipe = load_akan_model()
-                status_text.warning("Phase 2/4: Transcribing with Meta MMS (This takes a few minutes...)")
-                progress_bar.progress(50)
-
-                result = pipe(
-                    input_video,
-                    chunk_length_s=30,
-                    return_timestamps="word"
+            with artifacts_in_use(input_video, audio_path, output_srt, output_txt):
+                transcribe_and_format(
+                    file_hash, input_video, audio_path, output_srt, output_txt,
+                    model_size, selected_lang, task, progress_bar, status_text
                 )
 
-                status_text.info("Phase 3/4: Formatting & Translating Subtitles...")
-                progress_bar.progress(75)
-
-                with open(output_srt, "w", encoding="utf-8") as srt_file, open(output_txt, "w", encoding="utf-8") as txt_file:
-                    chunks_data = result.get("chunks", [])
-
-                    srt_idx = 1
-                    current_chunk = {"text": "", "start": None, "end": None}
-
-                    for word_data in chunks_data:
-                        word = word_data["text"]
-                        timestamp = word_data.get("timestamp", (None, None))
-                        start, end = timestamp
-
-                        if start is None or end is None:
-                            continue
-
-                        if current_chunk["start"] is None:
-                            current_chunk["start"] = start
-                            current_chunk["end"] = end
-                            current_chunk["text"] = word
-
-                        elif (end - current_chunk["start"]) <= 3.0:
-                            current_chunk["end"] = end
-                            current_chunk["text"] = (current_chunk["text"] + " " + word).strip()
-
-                        else:
-                            final_text = current_chunk['text'].strip()
-
-                            # --- INTERCEPT & TRANSLATE ---
-                            if task == "Translate to English" and final_text:
-                                try:
-                                    final_text = GoogleTranslator(source='auto', target='en').translate(final_text)
-                                except:
-                                    pass
-
-                            srt_file.write(f"{srt_idx}\n{format_timestamp(current_chunk['start'])} --> {format_timestamp(current_chunk['end'])}\n{final_text}\n\n")
-                            txt_file.write(f"{final_text}\n")
-                            srt_idx += 1
-                            current_chunk = {"start": start, "end": end, "text": word}
-
-                    if current_chunk["start"] is not None:
-                        final_text = current_chunk['text'].strip()
-
-                        if task == "Translate to English" and final_text:
-                            try:
-                                final_text = GoogleTranslator(source='auto', target='en').translate(final_text)
-                            except:
-                                pass
-
-                        srt_file.write(f"{srt_idx}\n{format_timestamp(current_chunk['start'])} --> {format_timestamp(current_chunk['end'])}\n{final_text}\n\n")
-                        txt_file.write(f"{final_text}\n")
-
-            else:
-                model = load_standard_model(model_size)
-                status_text.warning("Phase 2/4: Transcribing Audio (This takes a few minutes...)")
-                progress_bar.progress(50)
-
-                # --- BUG FIX: CORRECT OPENAI WHISPER KWARG ---
-                options = {
-                    "fp16": False,
-                    "condition_on_previous_text": False
-                }
-
-                if selected_lang != "Auto-Detect":
-                    options["language"] = selected_lang.lower()
-                if task == "Translate to English":
-                    options["task"] = "translate"
-
-                try:
-                    result = model.transcribe(input_video, **options)
-                except RuntimeError as e:
-                    st.error(f"Transcription failed: {e}. Please try a different video or model size.")
-                    result = {"segments": []}
-
-                status_text.info("Phase 3/4: Formatting Subtitles...")
-                progress_bar.progress(75)
-
-                with open(output_srt, "w", encoding="utf-8") as srt_file, open(output_txt, "w", encoding="utf-8") as txt_file:
-                    for i, segment in enumerate(result.get("segments", []), start=1):
-                        text = segment['text'].strip()
-                        srt_file.write(f"{i}\n{format_timestamp(segment['start'])} --> {format_timestamp(segment['end'])}\n{text}\n\n")
-                        txt_file.write(f"{text}\n")
-
-            progress_bar.progress(100)
+            progress_bar.empty()
             status_text.empty()
+            prune_cache(protected=session_files)
+
+        srt_bytes = load_artifact(output_srt)
+        txt_bytes = load_artifact(output_txt)
 
         if st.session_state.action_type == "burn" and not os.path.exists(output_video):
-            with st.spinner(f"🎨 Burning styled captions onto video at {export_res}..."):
-                scale_filter = ""
-                if export_res == "1080p":
-                    scale_filter = "scale=-2:1080,"
-                elif export_res == "720p (Recommended)":
-                    scale_filter = "scale=-2:720,"
-                elif export_res == "480p":
-                    scale_filter = "scale=-2:480,"
+            with st.spinner(f"🎨 Burning styled captions onto video at {export_res}..."), artifacts_in_use(input_video, output_srt, output_video):
+                height = EXPORT_HEIGHTS.get(export_res)
 
                 style = (
                     f"FontName={font_family},Fontsize={font_size},"
@@ -338,21 +903,42 @@ if uploaded_file:
                     f"Shadow={shadow_width},Alignment=2"
                 )
 
-                vf_string = f"{scale_filter}subtitles={output_srt}:force_style='{style}'"
+                overlay_filters = f"subtitles={output_srt}:force_style='{style}'"
 
                 if watermark_text:
                     safe_text = watermark_text.replace("'", "\\'").replace(":", "\\:")
                     drawtext_filter = f",drawtext=text='{safe_text}':fontcolor=white@{watermark_opacity}:fontsize={watermark_size}:x=w-tw-20:y=20"
-                    vf_string += drawtext_filter
-
+                    overlay_filters += drawtext_filter
+
+                # With no captions, watermark or rescale there is nothing to render, so just remux
+                if height or watermark_text or srt_bytes.strip():
+                    encoder = detect_video_encoder()
+                else:
+                    encoder = "copy"
+                # The device may be missing, or the source may not decode on it or remux into MP4,
+                # so anything other than libx264 gets a software encode as a fallback
+                attempts = [encoder] if encoder == "libx264" else [encoder, "libx264"]
                 try:
-                    (
-                        ffmpeg.input(input_video)
-                        .output(output_video, vf=vf_string)
-                        .run(overwrite_output=True, capture_stdout=True, capture_stderr=True)
-                    )
-                except ffmpeg.Error as e:
-                    st.error(f"Error burning subtitles: {e.stderr.decode('utf-8')}")
+                    duration = float(ffmpeg.probe(input_video)["format"].get("duration", 0))
+                except ffmpeg.Error:
+                    duration = 0
+                burn_progress = st.progress(0)
+                for attempt in attempts:
+                    try:
+                        run_with_progress(
+                            build_burn_command(input_video, output_video, height, overlay_filters, attempt),
+                            duration, burn_progress
+                        )
+                        break
+                    except ffmpeg.Error as e:
+                        burn_error = e
+                        # Never leave a half-written video behind to be served as a cached result
+                        if os.path.exists(output_video):
+                            os.remove(output_video)
+                else:
+                    st.error(f"Error burning subtitles: {burn_error.stderr.decode('utf-8')}")
+                burn_progress.empty()
+            prune_cache(protected=session_files)
 
     # --- PERSISTENT DOWNLOAD PANEL ---
     if st.session_state.action_type:
@@ -362,19 +948,15 @@ if uploaded_file:
         dl_col1, dl_col2, dl_col3, dl_col4 = st.columns(4)
 
         if st.session_state.action_type == "mp3" and os.path.exists(output_mp3):
-            with open(output_mp3, "rb") as f:
-                dl_col1.download_button("⬇️ Download MP3", f, file_name="audio_track.mp3", mime="audio/mpeg")
+            mp3_bytes = load_artifact(output_mp3)
+            dl_col1.download_button("⬇️ Download MP3", mp3_bytes, file_name="audio_track.mp3", mime="audio/mpeg")
 
         elif st.session_state.action_type in ["srt", "txt", "burn"]:
-            if os.path.exists(output_srt):
-                with open(output_srt, "rb") as f:
-                    dl_col1.download_button("📝 Download .SRT", f, file_name="subtitles.srt")
-            if os.path.exists(output_txt):
-                with open(output_txt, "rb") as f:
-                    dl_col2.download_button("📄 Download .TXT", f, file_name="transcript.txt")
+            dl_col1.download_button("📝 Download .SRT", srt_bytes, file_name="subtitles.srt")
+            dl_col2.download_button("📄 Download .TXT", txt_bytes, file_name="transcript.txt")
             if st.session_state.action_type == "burn" and os.path.exists(output_video):
-                with open(output_video, "rb") as f:
-                    dl_col3.download_button("🎬 Download Video", f, file_name="hackerslord_captioned.mp4")
+                video_bytes = load_artifact(output_video)
+                dl_col3.download_button("🎬 Download Video", video_bytes, file_name="hackerslord_captioned.mp4")
 
         st.markdown("<br>", unsafe_allow_html=True)
         if st.button("❌ Close & Clear Results"):